@@ -1,13 +1,106 @@
 # dashboard/app.py
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+import plotly.graph_objects as go
 import numpy as np
 import os
+import sys
+
+# Shared MA helpers live in src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from features import ema_lfilter
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(page_title="Adaptive MA Strategy Dashboard", layout="wide")
 
+# ---------- CACHED LOADERS ----------
+parquet_dir = "data/trimmed_parquet"
+
+@st.cache_data
+def load_symbol(csv_path, mtime):
+    """
+    Load a trimmed CSV with timezone-naive dates. The first load also writes a Parquet copy,
+    so later sessions skip CSV + date parsing. mtime keys the cache to the CSV version.
+    """
+    symbol = os.path.basename(csv_path)[:-4]
+    parquet_path = f"{parquet_dir}/{symbol}.parquet"
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= mtime:
+        return pd.read_parquet(parquet_path)
+
+    # Only Date + Close are used by the dashboard
+    df = pd.read_csv(csv_path, usecols=["Date", "Close"], parse_dates=["Date"], dtype={"Close": "float64"})
+    # Fix timezone issue (files with mixed offsets are still strings here)
+    df["Date"] = pd.to_datetime(df["Date"], utc=True, errors="coerce").dt.tz_convert(None)
+    os.makedirs(parquet_dir, exist_ok=True)
+    df.to_parquet(parquet_path, index=False)
+    return df
+
+@st.cache_data(ttl=60)
+def list_symbols(data_dir):
+    """Symbols with a trimmed CSV; re-scanned at most once a minute."""
+    return sorted(f[:-4] for f in os.listdir(data_dir) if f.endswith(".csv"))
+
+@st.cache_data
+def load_report(report_path, mtime):
+    """Optimization report; mtime keys the cache so a re-run optimization is picked up."""
+    return pd.read_csv(report_path)
+
+# ---------- CACHED CHART ----------
+max_chart_points = 1500
+
+def downsample_idx(n, max_points=max_chart_points):
+    """Indices of every k-th point (plus the last one) so long windows stay cheap to draw."""
+    if n <= max_points:
+        return np.arange(n)
+    step = -(-n // max_points)  # ceil division
+    return np.unique(np.r_[np.arange(0, n, step), n - 1])
+
+@st.cache_resource
+def build_price_chart(_df, symbol, ma_type, fast, slow, mtime):
+    """
+    Price / MA / crossover figure. Keyed on symbol + MA config + data mtime
+    (_df is not hashed), so reruns from unrelated widgets reuse the figure.
+    """
+    dates = _df["Date"].to_numpy()
+    closes = _df["Close"].to_numpy(dtype=np.float64)
+
+    # Compute moving averages
+    if ma_type == "EMA":
+        fast_vals = ema_lfilter(closes, fast)
+        slow_vals = ema_lfilter(closes, slow)
+    else:
+        fast_vals = pd.Series(closes).rolling(window=fast).mean().to_numpy()
+        slow_vals = pd.Series(closes).rolling(window=slow).mean().to_numpy()
+
+    # Crossovers in one pass: signal ±1, its step is +2 on a buy and -2 on a sell
+    sig = (fast_vals > slow_vals).astype(np.int8) * 2 - 1
+    dsig = np.diff(sig, prepend=sig[:1])
+    buy_idx = np.flatnonzero(dsig == 2)
+    sell_idx = np.flatnonzero(dsig == -2)
+
+    # Plot chart with WebGL traces (lines downsampled, signals kept exact)
+    idx = downsample_idx(len(closes))
+    fig = go.Figure()
+    fig.add_scattergl(x=dates[idx], y=closes[idx], mode="lines", name="Close Price",
+                      line_color="gray", opacity=0.6)
+    fig.add_scattergl(x=dates[idx], y=fast_vals[idx], mode="lines", name=f"{ma_type} {fast}",
+                      line_color="green")
+    fig.add_scattergl(x=dates[idx], y=slow_vals[idx], mode="lines", name=f"{ma_type} {slow}",
+                      line_color="orange")
+
+    # Mark buy/sell signals
+    fig.add_scattergl(x=dates[buy_idx], y=closes[buy_idx], mode="markers", name="Buy Signal",
+                      marker=dict(symbol="triangle-up", color="lime", size=12))
+    fig.add_scattergl(x=dates[sell_idx], y=closes[sell_idx], mode="markers", name="Sell Signal",
+                      marker=dict(symbol="triangle-down", color="red", size=12))
+
+    fig.update_layout(
+        title=f"{symbol} — {ma_type} ({fast}/{slow}) | Period: Aug 1 – Nov 7 2025",
+        height=500,
+        hovermode="x unified",
+    )
+    return fig
+
 # ---------- HEADER ----------
 st.title("Adaptive Moving Average Strategy Dashboard")
 
@@ -23,15 +116,14 @@ This interactive visualization displays results from our **adaptive algorithm**
 st.sidebar.header("Stock Selector")
 
 data_dir = "data/trimmed"
-symbols = sorted([f.replace(".csv", "") for f in os.listdir(data_dir) if f.endswith(".csv")])
+symbols = list_symbols(data_dir)
 selected_symbol = st.sidebar.selectbox("Select Stock Symbol", symbols)
 
 # ---------- LOAD DATA ----------
 file_path = f"{data_dir}/{selected_symbol}.csv"
-df = pd.read_csv(file_path)
+df = load_symbol(file_path, os.path.getmtime(file_path))
 
-# Fix timezone issue and filter to hackathon window
-df["Date"] = pd.to_datetime(df["Date"], utc=True, errors="coerce").dt.tz_convert(None)
+# Filter to hackathon window
 df = df[(df["Date"] >= pd.Timestamp("2025-08-01")) & (df["Date"] <= pd.Timestamp("2025-11-07"))]
 df = df.sort_values("Date")
 
@@ -41,7 +133,7 @@ if not os.path.exists(report_path):
     st.error("No optimization report found. Please run your dynamic_trend_noise optimization first.")
     st.stop()
 
-report = pd.read_csv(report_path)
+report = load_report(report_path, os.path.getmtime(report_path))
 best = report.iloc[0]
 
 # ---------- STRATEGY SUMMARY ----------
@@ -75,34 +167,8 @@ st.markdown("### Price Chart with Moving Averages & Crossovers *(graphs may show
 fast, slow = map(int, best["MA_Pair"].split("/"))
 ma_type = best["MA_Type"]
 
-# Compute moving averages
-if ma_type == "EMA":
-    df["MA_Fast"] = df["Close"].ewm(span=fast, adjust=False).mean()
-    df["MA_Slow"] = df["Close"].ewm(span=slow, adjust=False).mean()
-else:
-    df["MA_Fast"] = df["Close"].rolling(window=fast).mean()
-    df["MA_Slow"] = df["Close"].rolling(window=slow).mean()
-
-# Compute crossover signals
-df["Signal"] = np.where(df["MA_Fast"] > df["MA_Slow"], 1, -1)
-df["Crossover"] = df["Signal"].diff()
-
-# Plot chart
-fig, ax = plt.subplots(figsize=(13, 5))
-ax.plot(df["Date"], df["Close"], label="Close Price", color="gray", alpha=0.6)
-ax.plot(df["Date"], df["MA_Fast"], label=f"{ma_type} {fast}", color="green")
-ax.plot(df["Date"], df["MA_Slow"], label=f"{ma_type} {slow}", color="orange")
-
-# Mark buy/sell signals
-buys = df[df["Crossover"] == 2]
-sells = df[df["Crossover"] == -2]
-ax.scatter(buys["Date"], buys["Close"], marker="^", color="lime", s=80, label="Buy Signal")
-ax.scatter(sells["Date"], sells["Close"], marker="v", color="red", s=80, label="Sell Signal")
-
-ax.set_title(f"{selected_symbol} — {ma_type} ({fast}/{slow}) | Period: Aug 1 – Nov 7 2025", fontsize=13)
-ax.legend()
-ax.grid(alpha=0.3)
-st.pyplot(fig)
+fig = build_price_chart(df, selected_symbol, ma_type, fast, slow, os.path.getmtime(file_path))
+st.plotly_chart(fig, width="stretch")
 
 # ---------- MODEL INTERPRETATION ----------
 st.markdown("### Model Interpretation")
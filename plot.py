@@ -3,8 +3,7 @@ import matplotlib.pyplot as plt
 
 def plot_processed_csv(filepath):
     # Load file
-    df = pd.read_csv(filepath)
-    df["Date"] = pd.to_datetime(df["Date"])
+    df = pd.read_csv(filepath, parse_dates=["Date"])
 
     # Make sure moving averages exist
     if not {"MA_Fast", "MA_Slow", "Crossover"}.issubset(df.columns):
@@ -3,21 +3,312 @@
 import pandas as pd
 import numpy as np
 
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # Numba is optional: the jitted functions then run as plain Python
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# ---------- Jitted Metrics ----------
+# Shared by the single backtest and the pair grid, so both compute every metric the same way
+
+@njit(cache=True)
+def _close_returns(closes):
+    """Bar-to-bar close returns with NaN → 0, like pct_change().fillna(0) minus bar 0."""
+    rets = closes[1:] / closes[:-1] - 1
+    for i in range(len(rets)):
+        if np.isnan(rets[i]):
+            rets[i] = 0.0
+    return rets
+
+@njit(cache=True)
+def _equity_curve(rets, entry_idx, n_entries):
+    """
+    Compound close returns from 1 unit of capital (approximate equity).
+    Entry bars are left out of the curve, as the bar loop always did.
+    """
+    keep = np.ones(len(rets), dtype=np.bool_)
+    for k in range(n_entries):
+        keep[entry_idx[k] - 1] = False
+    kept = rets[keep]
+    equity = np.empty(len(kept) + 1)
+    equity[0] = 1.0
+    for i in range(len(kept)):
+        equity[i + 1] = equity[i] * (1 + kept[i])
+    return equity
+
+@njit(cache=True)
+def _drawdown_core(equity):
+    """Worst drop from the running peak, as a (negative) fraction."""
+    peak = equity[0]
+    worst = 0.0
+    for i in range(len(equity)):
+        peak = max(peak, equity[i])
+        worst = min(worst, equity[i] / peak - 1)
+    return worst
+
+@njit(cache=True)
+def _sharpe_core(daily_returns, periods_per_year):
+    """Annualized Sharpe ratio with the sample (ddof=1) std, as pandas computes it."""
+    n = len(daily_returns)
+    if n < 2:
+        return 0.0
+    mean = daily_returns.sum() / n
+    std = np.sqrt(((daily_returns - mean) ** 2).sum() / (n - 1))
+    if std == 0 or np.isnan(std):
+        return 0.0
+    return (mean / std) * np.sqrt(periods_per_year)
+
+@njit(cache=True)
+def _metrics_core(net_ret, equity):
+    """Unrounded (total return, win rate, max drawdown, Sharpe), all as fractions."""
+    n_trades = len(net_ret)
+    total = 1.0
+    wins = 0
+    for k in range(n_trades):
+        total *= 1 + net_ret[k]
+        if net_ret[k] > 0:
+            wins += 1
+    win_rate = wins / n_trades if n_trades > 0 else 0.0
+
+    daily_returns = np.zeros(len(equity))
+    for i in range(1, len(equity)):
+        r = equity[i] / equity[i - 1] - 1
+        daily_returns[i] = 0.0 if np.isnan(r) else r
+
+    return total - 1, win_rate, _drawdown_core(equity), _sharpe_core(daily_returns, 252.0)
+
 # ---------- Helper Metrics ----------
 
 def max_drawdown(equity):
     """Calculate maximum drawdown (worst loss from peak)."""
-    peak = equity.cummax()
-    drawdown = (equity / peak) - 1
-    return drawdown.min()
+    return float(_drawdown_core(np.asarray(equity, dtype=np.float64)))
 
 def sharpe_ratio(daily_returns, periods_per_year=252):
     """Annualized Sharpe ratio based on daily returns."""
-    mean = daily_returns.mean()
-    std = daily_returns.std()
-    if std == 0 or np.isnan(std):
-        return 0.0
-    return (mean / std) * np.sqrt(periods_per_year)
+    return float(_sharpe_core(np.asarray(daily_returns, dtype=np.float64), float(periods_per_year)))
+
+# ---------- Jitted Core ----------
+EXIT_MODES = {"opposite": 0, "time": 1}
+DAY_NS = 86_400_000_000_000  # one calendar day in nanoseconds
+
+# Exit reason codes written by the core
+REASON_OPPOSITE, REASON_TIME, REASON_STOP, REASON_TAKE = 0, 1, 2, 3
+
+@njit(cache=True)
+def _bt_core(times, opens, highs, lows, closes, ma_slow, cx,
+             cost_bps, hold_days, stop_loss, take_profit, exit_mode_code):
+    """
+    Bar-by-bar state machine over plain arrays.
+    times are int64 nanoseconds; stop_loss / take_profit of 0 mean "off".
+    Returns preallocated trade arrays plus the trade count and the number of entries
+    (one more than n_trades when a position is still open at the end).
+    """
+    n = len(closes)
+    entry_idx = np.empty(n, dtype=np.int64)
+    exit_idx = np.empty(n, dtype=np.int64)
+    net_ret = np.empty(n, dtype=np.float64)
+    reason = np.empty(n, dtype=np.int8)
+    n_trades = 0
+
+    cost = 2 * (cost_bps / 10000)  # entry + exit
+    in_position = False
+    entry = 0
+    entry_price = 0.0
+
+    for i in range(1, n):
+        # ENTRY condition: bullish crossover yesterday + price above the slow MA
+        if not in_position and cx[i - 1] == 2 and closes[i - 1] > ma_slow[i - 1]:
+            entry = i
+            entry_idx[n_trades] = i
+            entry_price = opens[i]
+            in_position = True
+            continue
+
+        # EXIT condition
+        if in_position:
+            code = -1
+            if exit_mode_code == 0 and cx[i - 1] == -2:
+                code = REASON_OPPOSITE
+            elif exit_mode_code == 1 and times[i] - times[entry] >= hold_days * DAY_NS:
+                code = REASON_TIME
+            elif stop_loss != 0.0 and lows[i] <= entry_price * (1 - stop_loss):
+                code = REASON_STOP
+            elif take_profit != 0.0 and highs[i] >= entry_price * (1 + take_profit):
+                code = REASON_TAKE
+
+            if code != -1:
+                exit_idx[n_trades] = i
+                net_ret[n_trades] = (opens[i] / entry_price) - 1 - cost
+                reason[n_trades] = code
+                n_trades += 1
+                in_position = False
+
+    n_entries = n_trades + 1 if in_position else n_trades
+    return entry_idx, exit_idx, net_ret, reason, n_trades, n_entries
+
+if not HAVE_NUMBA:
+    _bt_loop = _bt_core
+
+    def _bt_core(times, opens, highs, lows, closes, ma_slow, cx, *params):
+        """
+        Without Numba the same bar loop runs as plain Python. Feed it lists so
+        each bar reads Python scalars instead of paying for NumPy scalar indexing.
+        """
+        return _bt_loop(times.tolist(), opens.tolist(), highs.tolist(), lows.tolist(),
+                        closes.tolist(), ma_slow.tolist(), cx.tolist(), *params)
+
+# ---------- Array Backtest ----------
+def _run_core(times, opens, highs, lows, closes, ma_slow, crossover,
+              cost_bps, exit_mode, hold_days, stop_loss, take_profit):
+    """
+    Coerce inputs to the dtypes the jitted core expects, run it,
+    and build the equity curve from the trade entries.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+
+    entry_idx, exit_idx, net_ret, reason, n_trades, n_entries = _bt_core(
+        np.asarray(times, dtype=np.int64),
+        np.asarray(opens, dtype=np.float64),
+        np.asarray(highs, dtype=np.float64),
+        np.asarray(lows, dtype=np.float64),
+        closes,
+        np.asarray(ma_slow, dtype=np.float64),
+        np.asarray(crossover),  # int8 from compute_crossover, float64 when read from CSV
+        float(cost_bps),
+        int(hold_days),
+        float(stop_loss or 0.0),
+        float(take_profit or 0.0),
+        EXIT_MODES.get(exit_mode, -1),
+    )
+
+    equity = _equity_curve(_close_returns(closes), entry_idx, n_entries)
+
+    # Trades as parallel arrays (one slot per closed trade)
+    return (entry_idx[:n_trades], exit_idx[:n_trades], net_ret[:n_trades],
+            reason[:n_trades], equity)
+
+def _round_metrics(total_return, win_rate, drawdown, sharpe):
+    """
+    Metrics in %, rounded to 2 decimals. Works on scalars and on per-pair
+    arrays alike, so backtest_arrays and backtest_grid round identically.
+    """
+    return {
+        "Total Return": np.round(total_return * 100, 2),
+        "Max Drawdown": np.round(drawdown * 100, 2),
+        "Sharpe Ratio": np.round(sharpe, 2),
+        "Win Rate": np.round(win_rate * 100, 2),
+    }
+
+def _compute_metrics(net_ret, equity):
+    """Summary metrics from per-trade net returns and the equity curve."""
+    metrics = {k: float(v) for k, v in _round_metrics(*_metrics_core(net_ret, equity)).items()}
+    metrics["Trades"] = len(net_ret)
+    return metrics
+
+def backtest_arrays(
+    times,
+    opens,
+    highs,
+    lows,
+    closes,
+    ma_slow,
+    crossover,
+    cost_bps=15,
+    exit_mode="opposite",
+    hold_days=10,
+    stop_loss=None,
+    take_profit=None
+):
+    """
+    Same backtest as backtest_strategy, on date-sorted arrays (times as int64 ns).
+    Used by the optimizers to sweep MA pairs without building a DataFrame per pair.
+    Returns only the metrics dict.
+    """
+    _, _, net_ret, _, equity = _run_core(
+        times, opens, highs, lows, closes, ma_slow, crossover,
+        cost_bps, exit_mode, hold_days, stop_loss, take_profit
+    )
+    return _compute_metrics(net_ret, equity)
+
+# ---------- Pair Grid ----------
+@njit(parallel=True, cache=True)
+def _grid_core(times, opens, highs, lows, closes, ma_slow, cx,
+               cost_bps, hold_days, stop_loss, take_profit, exit_mode_code,
+               out_total_ret, out_win_rate, out_dd, out_sharpe, out_trades):
+    """
+    One backtest per column of ma_slow / cx (one column per MA pair), pairs in
+    parallel over the shared OHLC arrays. Writes unrounded metrics into out_*.
+    """
+    rets = _close_returns(closes)
+    for p in prange(cx.shape[1]):
+        entry_idx, _, net_ret, _, n_trades, n_entries = _bt_core(
+            times, opens, highs, lows, closes, ma_slow[:, p], cx[:, p],
+            cost_bps, hold_days, stop_loss, take_profit, exit_mode_code
+        )
+        equity = _equity_curve(rets, entry_idx, n_entries)
+        total_ret, win_rate, drawdown, sharpe = _metrics_core(net_ret[:n_trades], equity)
+        out_total_ret[p] = total_ret
+        out_win_rate[p] = win_rate
+        out_dd[p] = drawdown
+        out_sharpe[p] = sharpe
+        out_trades[p] = n_trades
+
+def backtest_grid(
+    times,
+    opens,
+    highs,
+    lows,
+    closes,
+    ma_slow,
+    crossover,
+    cost_bps=15,
+    exit_mode="opposite",
+    hold_days=10,
+    stop_loss=None,
+    take_profit=None
+):
+    """
+    backtest_arrays for many MA pairs in one call: ma_slow and crossover are
+    bars × pairs matrices, one column per pair (see compute_crossover).
+    Returns the backtest_arrays metrics as per-pair arrays.
+    """
+    ma_slow = np.asfortranarray(ma_slow, dtype=np.float64)  # contiguous column per pair
+    crossover = np.asfortranarray(crossover)
+    n_pairs = crossover.shape[1]
+    total_ret = np.empty(n_pairs)
+    win_rate = np.empty(n_pairs)
+    drawdown = np.empty(n_pairs)
+    sharpe = np.empty(n_pairs)
+    trades = np.empty(n_pairs, dtype=np.int64)
+
+    _grid_core(
+        np.asarray(times, dtype=np.int64),
+        np.asarray(opens, dtype=np.float64),
+        np.asarray(highs, dtype=np.float64),
+        np.asarray(lows, dtype=np.float64),
+        np.asarray(closes, dtype=np.float64),
+        ma_slow,
+        crossover,
+        float(cost_bps),
+        int(hold_days),
+        float(stop_loss or 0.0),
+        float(take_profit or 0.0),
+        EXIT_MODES.get(exit_mode, -1),
+        total_ret, win_rate, drawdown, sharpe, trades
+    )
+
+    metrics = _round_metrics(total_ret, win_rate, drawdown, sharpe)
+    metrics["Trades"] = trades
+    return metrics
+
+def date_to_ns(dates):
+    """Datetime Series → int64 nanoseconds, the time format the core expects."""
+    return pd.to_datetime(dates).values.astype("datetime64[ns]").view(np.int64)
 
 # ---------- Backtest Function ----------
 def backtest_strategy(
@@ -27,7 +318,8 @@ def backtest_strategy(
     exit_mode="opposite",
     hold_days=10,
     stop_loss=None,       # e.g., 0.03 = 3%
-    take_profit=None      # e.g., 0.05 = 5%
+    take_profit=None,     # e.g., 0.05 = 5%
+    trade_log=True        # False → trades as a dict of arrays, exit reasons as int codes
 ):
     """
     Runs a long-only MA crossover backtest with optimization levers.
@@ -38,92 +330,50 @@ def backtest_strategy(
     df = df.copy().sort_values("Date").reset_index(drop=True)
     df["Date"] = pd.to_datetime(df["Date"])
 
-    in_position = False
-    entry_price = 0.0
-    entry_date = None
-    trades = []
-    equity = [1.0]  # start with 1 unit capital
-
-    for i in range(1, len(df)):
-        prev = df.iloc[i - 1]
-        curr = df.iloc[i]
-
-        # ENTRY condition: bullish crossover yesterday + price confirmation
-        if not in_position and prev[entry_col] == 2:
-            # Confirm price is above the slow MA → true uptrend
-            if prev["Close"] > prev["MA_Slow"]:
-                entry_price = curr["Open"]
-                entry_date = curr["Date"]
-                in_position = True
-                continue
-
-        # EXIT condition: bearish crossover yesterday + price confirmation
-        if in_position:
-            exit_condition = False
-            # Only exit if confirmed downtrend (Close below slow MA)
-            if exit_mode == "opposite" and prev[entry_col] == -2 and prev["Close"] < prev["MA_Slow"]:
-                exit_condition = True
-            elif exit_mode == "time" and (curr["Date"] - entry_date).days >= hold_days:
-                exit_condition = True
-
-
-            # Opposite crossover
-            if exit_mode == "opposite" and prev[entry_col] == -2:
-                exit_condition = True
-                exit_reason = "Opposite crossover"
-
-            # Time-based exit
-            elif exit_mode == "time" and (curr["Date"] - entry_date).days >= hold_days:
-                exit_condition = True
-                exit_reason = f"{hold_days}-day exit"
-
-            # Stop-loss condition
-            elif stop_loss and curr["Low"] <= entry_price * (1 - stop_loss):
-                exit_condition = True
-                exit_reason = f"Stop loss ({stop_loss*100:.1f}%)"
-
-            # Take-profit condition
-            elif take_profit and curr["High"] >= entry_price * (1 + take_profit):
-                exit_condition = True
-                exit_reason = f"Take profit ({take_profit*100:.1f}%)"
-
-            if exit_condition:
-                exit_price = curr["Open"]
-                gross_return = (exit_price / entry_price) - 1
-                cost = 2 * (cost_bps / 10000)  # entry + exit
-                net_return = gross_return - cost
-                trades.append({
-                    "EntryDate": entry_date,
-                    "ExitDate": curr["Date"],
-                    "EntryPrice": entry_price,
-                    "ExitPrice": exit_price,
-                    "NetReturn": net_return,
-                    "ExitReason": exit_reason
-                })
-                in_position = False
-
-        # Track equity over time (approximate)
-        equity.append(equity[-1] * (1 + df["Close"].pct_change().fillna(0).iloc[i]))
-
-    # ---------- Metrics ----------
-    n_trades = len(trades)
-    if n_trades > 0:
-        win_rate = len([t for t in trades if t["NetReturn"] > 0]) / n_trades
-        total_return = np.prod([1 + t["NetReturn"] for t in trades]) - 1
-    else:
-        win_rate = 0
-        total_return = 0
-
-    equity_series = pd.Series(equity)
-    daily_returns = equity_series.pct_change().fillna(0)
-
-    metrics = {
-        "Total Return": round(total_return * 100, 2),
-        "Max Drawdown": round(max_drawdown(equity_series) * 100, 2),
-        "Sharpe Ratio": round(sharpe_ratio(daily_returns), 2),
-        "Win Rate": round(win_rate * 100, 2),
-        "Trades": n_trades
+    # Pull columns out once and hand plain arrays to the jitted core
+    opens = df["Open"].to_numpy(dtype=np.float64)
+    entry_idx, exit_idx, net_ret, reason, equity = _run_core(
+        date_to_ns(df["Date"]),
+        opens,
+        df["High"].to_numpy(),
+        df["Low"].to_numpy(),
+        df["Close"].to_numpy(),
+        df["MA_Slow"].to_numpy(),
+        df[entry_col].to_numpy(),
+        cost_bps, exit_mode, hold_days, stop_loss, take_profit
+    )
+
+    metrics = _compute_metrics(net_ret, equity)
+
+    if not trade_log:
+        trades = {
+            "EntryDate": df["Date"].to_numpy()[entry_idx],
+            "ExitDate": df["Date"].to_numpy()[exit_idx],
+            "EntryPrice": opens[entry_idx],
+            "ExitPrice": opens[exit_idx],
+            "NetReturn": net_ret,
+            "ExitReasonCode": reason,
+        }
+        return metrics, trades
+
+    # Verbose trade log: one dict per trade with a readable exit reason
+    reason_labels = {
+        REASON_OPPOSITE: "Opposite crossover",
+        REASON_TIME: f"{hold_days}-day exit",
+        REASON_STOP: f"Stop loss ({(stop_loss or 0)*100:.1f}%)",
+        REASON_TAKE: f"Take profit ({(take_profit or 0)*100:.1f}%)",
     }
+    dates = df["Date"]
+    trades = []
+    for k in range(len(net_ret)):
+        trades.append({
+            "EntryDate": dates.iloc[entry_idx[k]],
+            "ExitDate": dates.iloc[exit_idx[k]],
+            "EntryPrice": opens[entry_idx[k]],
+            "ExitPrice": opens[exit_idx[k]],
+            "NetReturn": net_ret[k],
+            "ExitReason": reason_labels[int(reason[k])]
+        })
 
     return metrics, trades
 
@@ -132,10 +382,9 @@ if __name__ == "__main__":
 
 
 # Load processed file
-    df = pd.read_csv("data/processed/HDFCBANK.NS.csv")
+    df = pd.read_csv("data/processed/HDFCBANK.NS.csv", parse_dates=["Date"])
 
     # Run backtest for 3 months
-    df["Date"] = pd.to_datetime(df["Date"])
     df_recent = df[df["Date"] >= (df["Date"].max() - pd.DateOffset(months=3))]
 
     metrics, trades = backtest_strategy(df_recent, cost_bps=15, exit_mode="opposite")
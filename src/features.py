@@ -3,53 +3,150 @@
 import pandas as pd
 import numpy as np
 import os
+from scipy.signal import lfilter
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # Numba is optional: EMA matrices fall back to ema_lfilter per span
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 # ---------- Moving Averages ----------
 def compute_sma(df, column="Close", window=20):
     return df[column].rolling(window=window).mean()
 
+def sma_array(x, window):
+    """SMA of a NumPy array (rolling mean on a Series view, no DataFrame)."""
+    return pd.Series(x, copy=False).rolling(window=window).mean().to_numpy()
+
+def ema_lfilter(x, span):
+    """
+    EMA of a NumPy array, same as Series.ewm(span=span, adjust=False).mean(),
+    run as a first-order IIR filter (no pandas objects). NaNs are not skipped.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if len(x) == 0:
+        return x.copy()
+    alpha = 2 / (span + 1)
+    ema = np.empty_like(x)
+    ema[0] = x[0]  # seed exactly, like pandas, so equal spans start out equal
+    ema[1:] = lfilter([alpha], [1, alpha - 1], x[1:], zi=[x[0] * (1 - alpha)])[0]
+    return ema
+
+@njit(parallel=True, cache=True)
+def multi_ewm(close, spans, out):
+    """
+    EMA (adjust=False) for several spans in one kernel: out[:, j] ← spans[j].
+    Spans run in parallel and all read the same close array; pass a
+    Fortran-ordered out so each span writes one contiguous column.
+    """
+    n = close.shape[0]
+    for j in prange(spans.shape[0]):
+        alpha = 2.0 / (spans[j] + 1)
+        ema = close[0]
+        out[0, j] = ema
+        for i in range(1, n):
+            ema = alpha * close[i] + (1 - alpha) * ema
+            out[i, j] = ema
+
 def compute_ema(df, column="Close", span=20):
-    return df[column].ewm(span=span, adjust=False).mean()
+    return pd.Series(ema_lfilter(df[column].to_numpy(), span), index=df.index)
+
+def wma_array(x, window):
+    """WMA of a NumPy array: linear weights (newest highest) applied as one convolution."""
+    prices = np.asarray(x, dtype=np.float64)
+    weights = np.arange(1, window + 1, dtype=np.float64)
+    wma = np.full(prices.shape, np.nan)
+    if len(prices) >= window:
+        wma[window - 1:] = np.convolve(prices, weights[::-1], mode="valid") / weights.sum()
+    return wma
 
 def compute_wma(df, column="Close", window=20):
-    weights = np.arange(1, window + 1)
-    return (
-        df[column]
-        .rolling(window)
-        .apply(lambda prices: np.dot(prices, weights) / weights.sum(), raw=True)
-    )
+    return pd.Series(wma_array(df[column].to_numpy(), window), index=df.index)
+
+def _ma_array_func(ma_type):
+    ma = {"SMA": sma_array, "EMA": ema_lfilter, "WMA": wma_array}.get(ma_type.upper())
+    if ma is None:
+        raise ValueError("ma_type must be SMA, EMA, or WMA")
+    return ma
 
 # ---------- Feature Builder ----------
+def compute_ma_pair(close, ma_type="SMA", fast=10, slow=20):
+    """
+    Fast and slow MAs straight from a Close array. A pair sweep extracts the
+    array once and calls this per pair instead of copying the DataFrame.
+    """
+    ma = _ma_array_func(ma_type)
+    return ma(close, fast), ma(close, slow)
+
 def add_moving_averages(df, ma_type="SMA", fast=10, slow=20):
     df = df.copy()
-    if ma_type.upper() == "SMA":
-        df[f"MA_Fast"] = compute_sma(df, "Close", fast)
-        df[f"MA_Slow"] = compute_sma(df, "Close", slow)
-    elif ma_type.upper() == "EMA":
-        df[f"MA_Fast"] = compute_ema(df, "Close", fast)
-        df[f"MA_Slow"] = compute_ema(df, "Close", slow)
-    elif ma_type.upper() == "WMA":
-        df[f"MA_Fast"] = compute_wma(df, "Close", fast)
-        df[f"MA_Slow"] = compute_wma(df, "Close", slow)
-    else:
-        raise ValueError("ma_type must be SMA, EMA, or WMA")
+    df["MA_Fast"], df["MA_Slow"] = compute_ma_pair(df["Close"].to_numpy(), ma_type, fast, slow)
     return df
 
 # ---------- Signal Detection ----------
+def compute_signal(ma_fast, ma_slow):
+    """1 → bullish (fast above slow), -1 → bearish, 0 → equal or MA not ready yet."""
+    diff = np.asarray(ma_fast, dtype=np.float64) - np.asarray(ma_slow, dtype=np.float64)
+    return np.nan_to_num(np.sign(diff)).astype(np.int8)
+
+def compute_crossover(ma_fast, ma_slow):
+    """
+    +2 → bullish cross, -2 → bearish cross, as an int8 array (first bar is 0).
+    Bars × pairs MA matrices give one crossover column per pair.
+    """
+    signal = compute_signal(ma_fast, ma_slow)
+    return np.diff(signal, axis=0, prepend=signal[:1])
+
 def generate_signals(df):
     df = df.copy()
-    df["Signal"] = 0
-    df.loc[df["MA_Fast"] > df["MA_Slow"], "Signal"] = 1   # Bullish
-    df.loc[df["MA_Fast"] < df["MA_Slow"], "Signal"] = -1  # Bearish
+    signal = compute_signal(df["MA_Fast"], df["MA_Slow"])
+    df["Signal"] = signal  # 1 → bullish, -1 → bearish
 
     # Identify crossover points
-    df["Crossover"] = df["Signal"].diff()  # +2 → bullish cross, -2 → bearish cross
+    df["Crossover"] = np.diff(signal, prepend=signal[:1])  # +2 → bullish cross, -2 → bearish cross
     return df
 
+# ---------- MA Matrix (for window sweeps) ----------
+def compute_ma_matrix(df, spans, ma_type="SMA", column="Close"):
+    """
+    Computes one MA column per span in a single pass over the spans,
+    so an optimizer can look up any (fast, slow) pair without recomputing.
+    """
+    ma = _ma_array_func(ma_type)
+    close = df[column].to_numpy(dtype=np.float64)
+
+    if ma is ema_lfilter and HAVE_NUMBA:
+        # All EMA spans in a single parallel pass over close
+        matrix = np.empty((len(close), len(spans)), order="F")
+        if len(close) > 0:
+            multi_ewm(close, np.asarray(spans, dtype=np.int64), matrix)
+        return matrix
+
+    matrix = np.empty((len(df), len(spans)))
+    for j, span in enumerate(spans):
+        matrix[:, j] = ma(close, span)
+    return matrix
+
+# ---------- Loaders ----------
+PRICE_COLUMNS = ["Date", "Open", "High", "Low", "Close"]
+
+def load_prices(filepath):
+    """Date + OHLC only (all a backtest needs), with dates parsed by read_csv itself."""
+    return pd.read_csv(
+        filepath,
+        usecols=PRICE_COLUMNS,
+        parse_dates=["Date"],
+        dtype={col: "float64" for col in PRICE_COLUMNS[1:]},
+    )
+
 # ---------- Master Function ----------
 def process_file(filepath, ma_type="SMA", fast=10, slow=20):
-    df = pd.read_csv(filepath)
-    df["Date"] = pd.to_datetime(df["Date"])
+    df = pd.read_csv(filepath, parse_dates=["Date"])
     df = df.sort_values("Date")
 
     # Add MAs
@@ -4,16 +4,18 @@ import yfinance as yf
 import pandas as pd
 import os
 
-def get_yf_data(symbol, out_dir="data/raw", months=12):
-    """Fetch daily EOD data from Yahoo Finance (works for NSE tickers with .NS)"""
+# Column order written by Ticker.history(); kept so batch downloads produce identical CSVs
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+
+def save_yf_data(symbol, df, out_dir="data/raw"):
+    """Write one ticker's history to out_dir/{symbol}.csv"""
     os.makedirs(out_dir, exist_ok=True)
-    ticker = yf.Ticker(symbol)
-    df = ticker.history(period=f"{months}mo")  # last N months
     if df.empty:
         print(f"⚠️ No data for {symbol}")
         return None
 
-    df.reset_index(inplace=True)
+    df = df.reset_index()
+    df.columns.name = None
     df.rename(columns={
         "Date": "Date",
         "Open": "Open",
@@ -29,7 +31,36 @@ def get_yf_data(symbol, out_dir="data/raw", months=12):
     print(f"✅ Saved {symbol}: {len(df)} rows")
     return df
 
+def get_yf_data(symbol, out_dir="data/raw", months=12):
+    """Fetch daily EOD data from Yahoo Finance (works for NSE tickers with .NS)"""
+    ticker = yf.Ticker(symbol)
+    df = ticker.history(period=f"{months}mo")  # last N months
+    return save_yf_data(symbol, df, out_dir)
+
+def get_yf_data_batch(symbols, out_dir="data/raw", months=12):
+    """Fetch several tickers in one threaded yf.download call, then save one CSV per ticker."""
+    data = yf.download(
+        symbols,
+        period=f"{months}mo",
+        group_by="ticker",
+        threads=True,
+        auto_adjust=True,   # same prices as Ticker.history()
+        actions=True,       # keep Dividends / Stock Splits columns
+        ignore_tz=False,    # keep exchange-local timestamps (+05:30)
+        progress=False,
+    )
+    frames = {}
+    for symbol in symbols:
+        if symbol not in data.columns.get_level_values(0):
+            print(f"⚠️ No data for {symbol}")
+            continue
+        df = data[symbol].dropna(how="all")  # rows from other tickers' trading days
+        df = df[[c for c in PRICE_COLUMNS if c in df.columns]]
+        if "Volume" in df and not df["Volume"].isna().any():
+            df = df.astype({"Volume": "int64"})  # alignment across tickers upcasts to float
+        frames[symbol] = save_yf_data(symbol, df, out_dir)
+    return frames
+
 if __name__ == "__main__":
     symbols = ["ICICIBANK.NS", "ITC.NS", "MARUTI.NS","TATASTEEL.NS","LT.NS"]
-    for s in symbols:
-        get_yf_data(s)
+    get_yf_data_batch(symbols)
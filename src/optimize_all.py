@@ -1,26 +1,35 @@
 import os
+from itertools import product
 import pandas as pd
+from joblib import Parallel, delayed
 from optimize_ma import optimize_ma_windows
 
+def _optimize_symbol(symbol, ma_pairs, ma_type):
+    """Worker: results for one symbol / MA type sweep, or None if it fails."""
+    try:
+        return optimize_ma_windows(symbol, ma_pairs=ma_pairs, ma_type=ma_type, save=False)
+    except Exception as e:
+        print(f"⚠️ Error optimizing {symbol} ({ma_type}): {e}")
+        return None
+
 def run_all_optimizations(
     processed_dir="data/processed",
     ma_types=["EMA", "SMA"],
-    ma_pairs=None
+    ma_pairs=None,
+    n_jobs=-1
 ):
     if ma_pairs is None:
         ma_pairs = [(10, 20), (12, 26), (20, 50), (50, 100), (50, 200)]
 
-    all_results = []
-
     files = [f for f in os.listdir(processed_dir) if f.endswith(".csv")]
-    for file in files:
-        symbol = file.replace(".csv", "")
-        for ma_type in ma_types:
-            try:
-                df_res = optimize_ma_windows(symbol, ma_pairs=ma_pairs, ma_type=ma_type)
-                all_results.append(df_res)
-            except Exception as e:
-                print(f"⚠️ Error optimizing {symbol} ({ma_type}): {e}")
+    symbols = [file.replace(".csv", "") for file in files]
+
+    # Every (symbol, MA type) sweep is independent → run them in parallel
+    results = Parallel(n_jobs=n_jobs, backend="loky")(
+        delayed(_optimize_symbol)(symbol, ma_pairs, ma_type)
+        for symbol, ma_type in product(symbols, ma_types)
+    )
+    all_results = [r for r in results if r is not None]
 
     # Combine all results
     combined = pd.concat(all_results, ignore_index=True)
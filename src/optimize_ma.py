@@ -1,75 +1,66 @@
 import pandas as pd
-from backtest import backtest_strategy
-
-# ---------- Function to Recompute MAs ----------
-def add_moving_averages(df, ma_type="EMA", fast=10, slow=20):
-    df = df.copy()
-
-    # Calculate moving averages
-    if ma_type.upper() == "SMA":
-        df["MA_Fast"] = df["Close"].rolling(window=fast).mean()
-        df["MA_Slow"] = df["Close"].rolling(window=slow).mean()
-    elif ma_type.upper() == "EMA":
-        df["MA_Fast"] = df["Close"].ewm(span=fast, adjust=False).mean()
-        df["MA_Slow"] = df["Close"].ewm(span=slow, adjust=False).mean()
-    else:
-        raise ValueError("ma_type must be SMA or EMA")
-
-    # Generate signals and crossovers
-    df["Signal"] = 0
-    df.loc[df["MA_Fast"] > df["MA_Slow"], "Signal"] = 1
-    df.loc[df["MA_Fast"] < df["MA_Slow"], "Signal"] = -1
-    df["Crossover"] = df["Signal"].diff()
-
-    return df
+from backtest import backtest_grid, date_to_ns
+from features import compute_ma_matrix, compute_crossover, load_prices
 
 # ---------- Optimizer Function ----------
-def optimize_ma_windows(symbol="INFY.NS", ma_pairs=None, ma_type="EMA"):
+def optimize_ma_windows(symbol="INFY.NS", ma_pairs=None, ma_type="EMA", save=True):
+    """
+    Backtests every MA pair for one symbol.
+    Returns the results DataFrame (best return first);
+    with save=True it is also printed and written to reports/.
+    """
     if ma_pairs is None:
         ma_pairs = [(10, 20), (12, 26), (20, 50), (50, 100), (50, 200)]
 
     # Load data
-    df = pd.read_csv(f"data/processed/{symbol}.csv")
-    df["Date"] = pd.to_datetime(df["Date"])
+    df = load_prices(f"data/processed/{symbol}.csv")
     df_recent = df[df["Date"] >= (df["Date"].max() - pd.DateOffset(months=3))]
 
-    results = []
-
-    # Loop over MA pairs
-    for fast, slow in ma_pairs:
-        df_pair = add_moving_averages(df_recent, ma_type=ma_type, fast=fast, slow=slow)
+    # Compute every MA once; each pair just picks two columns
+    spans = sorted({span for pair in ma_pairs for span in pair})
+    ma_matrix = compute_ma_matrix(df_recent, spans, ma_type=ma_type)
+    col = {span: j for j, span in enumerate(spans)}
 
-        metrics, _ = backtest_strategy(
-            df_pair,
-            exit_mode="time",
-            hold_days=7,
-            stop_loss=0.03,
-            take_profit=0.05,
-            cost_bps=15
-        )
+    times = date_to_ns(df_recent["Date"])
+    opens = df_recent["Open"].to_numpy()
+    highs = df_recent["High"].to_numpy()
+    lows = df_recent["Low"].to_numpy()
+    closes = df_recent["Close"].to_numpy()
 
-        results.append({
-            "Symbol": symbol,
-            "MA_Type": ma_type,
-            "MA_Pair": f"{fast}/{slow}",
-            "Return": metrics["Total Return"],
-            "WinRate": metrics["Win Rate"],
-            "Sharpe": metrics["Sharpe Ratio"],
-            "MaxDD": metrics["Max Drawdown"],
-            "Trades": metrics["Trades"]
-        })
+    # Backtest every pair in one parallel pass over the shared OHLC arrays
+    ma_fast = ma_matrix[:, [col[fast] for fast, _ in ma_pairs]]
+    ma_slow = ma_matrix[:, [col[slow] for _, slow in ma_pairs]]
+    metrics = backtest_grid(
+        times, opens, highs, lows, closes,
+        ma_slow, compute_crossover(ma_fast, ma_slow),
+        exit_mode="time",
+        hold_days=7,
+        stop_loss=0.03,
+        take_profit=0.05,
+        cost_bps=15
+    )
 
-    # Create DataFrame
-    results_df = pd.DataFrame(results)
-    results_df = results_df.sort_values("Return", ascending=False).reset_index(drop=True)
+    # Build the results column-wise, straight from the per-pair metric arrays
+    results_df = pd.DataFrame({
+        "Symbol": symbol,
+        "MA_Type": ma_type,
+        "MA_Pair": [f"{fast}/{slow}" for fast, slow in ma_pairs],
+        "Return": metrics["Total Return"],
+        "WinRate": metrics["Win Rate"],
+        "Sharpe": metrics["Sharpe Ratio"],
+        "MaxDD": metrics["Max Drawdown"],
+        "Trades": metrics["Trades"]
+    })
+    results_df = results_df.sort_values("Return", ascending=False, kind="stable").reset_index(drop=True)
 
-    print(f"\n📊 Optimization Results for {symbol} ({ma_type})")
-    print(results_df)
+    if save:
+        print(f"\n📊 Optimization Results for {symbol} ({ma_type})")
+        print(results_df)
 
-    # Save to reports/
-    out_path = f"reports/{symbol.replace('.','_')}_{ma_type}_optimization.csv"
-    results_df.to_csv(out_path, index=False)
-    print(f"✅ Saved results → {out_path}")
+        # Save to reports/
+        out_path = f"reports/{symbol.replace('.','_')}_{ma_type}_optimization.csv"
+        results_df.to_csv(out_path, index=False)
+        print(f"✅ Saved results → {out_path}")
 
     return results_df
 
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
-from backtest import backtest_strategy
+from joblib import Parallel, delayed
+from backtest import backtest_grid, date_to_ns
+from features import compute_ma_matrix, compute_crossover, load_prices
 
 # ---------- Helper: Compute Volatility ----------
 def compute_volatility(df, window=20):
@@ -19,25 +21,6 @@ def compute_trend_strength(df, window=20):
     end_price = df["Close"].iloc[-1]
     return abs(end_price - start_price) / start_price
 
-# ---------- Add Moving Averages ----------
-def add_moving_averages(df, ma_type="EMA", fast=10, slow=20):
-    df = df.copy()
-    if ma_type.upper() == "EMA":
-        df["MA_Fast"] = df["Close"].ewm(span=fast, adjust=False).mean()
-        df["MA_Slow"] = df["Close"].ewm(span=slow, adjust=False).mean()
-    elif ma_type.upper() == "SMA":
-        df["MA_Fast"] = df["Close"].rolling(window=fast).mean()
-        df["MA_Slow"] = df["Close"].rolling(window=slow).mean()
-    else:
-        raise ValueError("ma_type must be EMA or SMA")
-
-    # Signals
-    df["Signal"] = 0
-    df.loc[df["MA_Fast"] > df["MA_Slow"], "Signal"] = 1
-    df.loc[df["MA_Fast"] < df["MA_Slow"], "Signal"] = -1
-    df["Crossover"] = df["Signal"].diff()
-    return df
-
 # ---------- Smart MA Selector ----------
 def select_ma_type(vol, trend, vol_threshold=0.01, trend_threshold=0.05):
     """
@@ -57,8 +40,7 @@ def optimize_dynamic_trend(symbol, ma_pairs=None, vol_threshold=0.01, trend_thre
 
     print(f"\n🔍 Running dynamic + trend-aware optimization for {symbol}...")
 
-    df = pd.read_csv(f"data/processed/{symbol}.csv")
-    df["Date"] = pd.to_datetime(df["Date"])
+    df = load_prices(f"data/processed/{symbol}.csv")
     df_recent = df[df["Date"] >= (df["Date"].max() - pd.DateOffset(months=3))]
 
     # Compute regime stats
@@ -68,33 +50,44 @@ def optimize_dynamic_trend(symbol, ma_pairs=None, vol_threshold=0.01, trend_thre
 
     print(f"📈 Volatility = {vol:.2%}, Trend = {trend:.2%} → Using {ma_type}")
 
-    results = []
-
-    for fast, slow in ma_pairs:
-        df_pair = add_moving_averages(df_recent, ma_type=ma_type, fast=fast, slow=slow)
-        metrics, _ = backtest_strategy(
-            df_pair,
-            exit_mode="time",
-            hold_days=7,
-            stop_loss=0.03,
-            take_profit=0.05,
-            cost_bps=15
-        )
-
-        results.append({
-            "Symbol": symbol,
-            "Volatility": round(vol * 100, 2),
-            "TrendStrength": round(trend * 100, 2),
-            "MA_Type": ma_type,
-            "MA_Pair": f"{fast}/{slow}",
-            "Return": metrics["Total Return"],
-            "WinRate": metrics["Win Rate"],
-            "Sharpe": metrics["Sharpe Ratio"],
-            "MaxDD": metrics["Max Drawdown"],
-            "Trades": metrics["Trades"]
-        })
-
-    results_df = pd.DataFrame(results).sort_values("Return", ascending=False).reset_index(drop=True)
+    # Compute every MA once; each pair just picks two columns
+    spans = sorted({span for pair in ma_pairs for span in pair})
+    ma_matrix = compute_ma_matrix(df_recent, spans, ma_type=ma_type)
+    col = {span: j for j, span in enumerate(spans)}
+
+    times = date_to_ns(df_recent["Date"])
+    opens = df_recent["Open"].to_numpy()
+    highs = df_recent["High"].to_numpy()
+    lows = df_recent["Low"].to_numpy()
+    closes = df_recent["Close"].to_numpy()
+
+    # Backtest every pair in one parallel pass over the shared OHLC arrays
+    ma_fast = ma_matrix[:, [col[fast] for fast, _ in ma_pairs]]
+    ma_slow = ma_matrix[:, [col[slow] for _, slow in ma_pairs]]
+    metrics = backtest_grid(
+        times, opens, highs, lows, closes,
+        ma_slow, compute_crossover(ma_fast, ma_slow),
+        exit_mode="time",
+        hold_days=7,
+        stop_loss=0.03,
+        take_profit=0.05,
+        cost_bps=15
+    )
+
+    # Build the results column-wise, straight from the per-pair metric arrays
+    results_df = pd.DataFrame({
+        "Symbol": symbol,
+        "Volatility": round(vol * 100, 2),
+        "TrendStrength": round(trend * 100, 2),
+        "MA_Type": ma_type,
+        "MA_Pair": [f"{fast}/{slow}" for fast, slow in ma_pairs],
+        "Return": metrics["Total Return"],
+        "WinRate": metrics["Win Rate"],
+        "Sharpe": metrics["Sharpe Ratio"],
+        "MaxDD": metrics["Max Drawdown"],
+        "Trades": metrics["Trades"]
+    })
+    results_df = results_df.sort_values("Return", ascending=False, kind="stable").reset_index(drop=True)
     out_path = f"reports/{symbol.replace('.', '_')}_dynamic_trend_optimization.csv"
     results_df.to_csv(out_path, index=False)
 
@@ -103,14 +96,20 @@ def optimize_dynamic_trend(symbol, ma_pairs=None, vol_threshold=0.01, trend_thre
     return results_df
 
 # ---------- Batch Runner ----------
-def run_all_dynamic_trend(symbols):
-    all_results = []
-    for sym in symbols:
-        try:
-            df_res = optimize_dynamic_trend(sym)
-            all_results.append(df_res.head(1))  # best pair per stock
-        except Exception as e:
-            print(f"⚠️ Error for {sym}: {e}")
+def _best_dynamic_trend(sym):
+    """Worker: best pair for one symbol, or None if it fails."""
+    try:
+        return optimize_dynamic_trend(sym).head(1)  # best pair per stock
+    except Exception as e:
+        print(f"⚠️ Error for {sym}: {e}")
+        return None
+
+def run_all_dynamic_trend(symbols, n_jobs=-1):
+    # Symbols are independent → one worker per symbol
+    results = Parallel(n_jobs=n_jobs, backend="loky")(
+        delayed(_best_dynamic_trend)(sym) for sym in symbols
+    )
+    all_results = [r for r in results if r is not None]
     if all_results:
         final = pd.concat(all_results, ignore_index=True)
         final.to_csv("reports/best_dynamic_trend_summary.csv", index=False)
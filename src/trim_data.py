@@ -18,8 +18,8 @@ summary = []
 for file in os.listdir(input_dir):
     if file.endswith(".csv"):
         file_path = os.path.join(input_dir, file)
-        df = pd.read_csv(file_path)
-        # Convert and remove timezone info safely
+        df = pd.read_csv(file_path, parse_dates=["Date"])
+        # Convert and remove timezone info safely (cheap if read_csv already parsed the dates)
         df["Date"] = pd.to_datetime(df["Date"], utc=True, errors="coerce").dt.tz_convert(None)
 
         # Strictly include data between start_date and end_date (inclusive)